@@ -1,9 +1,34 @@
 # connectors/hive_connection.py
 
+import functools
 import json
+from pathlib import Path
 from pyhive import hive
 from contextlib import contextmanager
 
+try:
+    import orjson  # 可选依赖，解析速度更快
+except ImportError:
+    orjson = None
+
+# secrets.json 位于项目根目录下的 secrets 目录中，路径与当前工作目录无关
+SECRETS_PATH = Path(__file__).resolve().parent.parent / 'secrets' / 'secrets.json'
+
+
+@functools.lru_cache(maxsize=1)
+def read_secrets_file():
+    """
+    读取并解析 secrets.json 文件，结果在进程内缓存，修改文件后可调用 read_secrets_file.cache_clear() 重新加载
+
+    :return: 配置字典
+    """
+    if orjson is not None:
+        with open(SECRETS_PATH, 'rb') as f:
+            return orjson.loads(f.read())
+
+    with open(SECRETS_PATH, 'r') as f:
+        return json.load(f)
+
 
 def load_secrets():
     """
@@ -12,9 +37,8 @@ def load_secrets():
     :return: 配置字典，如果加载失败则返回 None
     """
     try:
-        with open('../secrets/secrets.json', 'r') as f:
-            secrets = json.load(f)
-        return secrets
+        # 读取失败时抛出的异常不会被缓存，下次调用会重新尝试读取
+        return read_secrets_file()
     except Exception as e:
         print(f"读取 secrets.json 时出错: {e}")
         return None
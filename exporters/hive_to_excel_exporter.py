@@ -3,277 +3,370 @@
 import pandas as pd
 import re
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from openpyxl import Workbook
 from connectors.hive_connection import get_hive_connection  # 引入连接管理工具
-from utils.excel_utils import adjust_column_widths
-from utils.string_utils import calculate_display_width
+from utils.excel_utils import adjust_column_widths, iter_dataframe_rows
+from utils.hive_meta_cache import load_meta_cache, save_meta_cache
+from utils.string_utils import sanitize_filename
+
+# 每次从 Hive 拉取数据的行数（游标 arraysize），减少 FetchResults 的往返次数
+FETCH_BATCH_SIZE = 10000
+
+# Excel 单个工作表的最大行数和列数
+EXCEL_MAX_ROWS = 1048576
+EXCEL_MAX_COLUMNS = 16384
+
+# 表信息、列信息 sheet 的表头固定、内容较少，直接使用固定列宽
+TABLE_INFO_COLUMN_WIDTHS = {'A': 12, 'B': 60}  # 信息、内容
+COLUMN_INFO_COLUMN_WIDTHS = {'A': 30, 'B': 20, 'C': 40}  # 列名、列类型、列注释
+
+# 从 DESCRIBE EXTENDED 的 Detailed Table Information 中提取表注释
+TABLE_COMMENT_PATTERN = re.compile(r'parameters:\{(?:.*?, )?comment=(.*?)(?:, [\w.]+=|\}[,)])')
 
 
 class HiveToExcelExporter:
-    def __init__(self, database, prefix, excel_output_dir):
+    def __init__(self, database, prefix, excel_output_dir, max_workers=4, use_meta_cache=True,
+                 column_filter=None, row_limit=None):
         """
         初始化参数
 
         :param database: Hive 数据库名
         :param prefix: 表名的前缀
         :param excel_output_dir: 输出 Excel 文件的目录路径
+        :param max_workers: 并行导出的最大进程数，受集群并发查询数限制
+        :param use_meta_cache: 是否使用本地缓存的表注释和列信息，减少 Hive 元数据查询
+        :param column_filter: 列筛选函数，参数为列名，返回 True 表示导出该列；为 None 时导出所有列
+        :param row_limit: 每张表最多导出的行数，为 None 时导出全部数据
         """
         self.database = database
         self.prefix = prefix
         self.excel_output_dir = excel_output_dir
-        self.existing_filenames = {}  # 用于跟踪文件名以处理重复
+        self.max_workers = max_workers
+        self.use_meta_cache = use_meta_cache
+        self.column_filter = column_filter
+        self.row_limit = row_limit
+        self.existing_filenames = set()  # 输出目录中已存在和本次已使用的文件名，用于处理重复
 
-    def get_tables_by_prefix(self, connection):
+    def get_tables_by_prefix(self, cursor):
         """
-        获取符合前缀的所有表名
+        获取符合前缀的所有表名（调用前需已切换到指定数据库）
 
-        :param connection: Hive 连接对象
+        :param cursor: Hive 游标对象
         :return: 表名列表
         """
-        cursor = connection.cursor()
-        cursor.execute(f"USE {self.database}")  # 切换到指定数据库
         cursor.execute(f"SHOW TABLES LIKE '{self.prefix}*'")  # 使用 LIKE 来匹配前缀
-        tables = cursor.fetchall()
+        table_names = [row[0] for row in cursor.fetchall()]
 
         print("----- 获取符合前缀的表名 -----")
-        table_count = len(tables)
+        table_count = len(table_names)
         print(f"找到 {table_count} 张符合前缀 '{self.prefix}' 的表。")
-        if not tables:
+        if not table_names:
             print(f"没有找到符合前缀 '{self.prefix}' 的表。")
         else:
-            table_names = [table[0] for table in tables]
             print("找到的表名列表:")
             for table in table_names:
                 print(f"  - {table}")
 
         print("----- 结束获取表名 -----\n")
-        return [table[0] for table in tables]
+        return table_names
 
-    def get_table_comment(self, table_name, connection):
+    def get_table_metadata(self, table_name, cursor):
         """
-        获取表的中文注释，使用 SHOW TBLPROPERTIES
+        获取表的中文注释和列信息，使用一次 DESCRIBE EXTENDED 查询，在本地解析结果
 
         :param table_name: 表名
-        :param connection: Hive 连接对象
-        :return: 表的中文注释
-        """
-        cursor = connection.cursor()
-        # 使用 SHOW TBLPROPERTIES 获取注释
-        try:
-            cursor.execute(f"SHOW TBLPROPERTIES {table_name}('comment')")
-            result = cursor.fetchall()
-
-            # 假设第一个元素就是所需的注释
-            if result and len(result) > 0 and result[0][0]:
-                table_comment = result[0][0].strip()
-                return table_comment
-            else:
-                print(f"表 '{table_name}' 没有通过 SHOW TBLPROPERTIES 获取注释，使用表名作为注释。")
-                return table_name
-        except Exception as e:
-            print(f"使用 SHOW TBLPROPERTIES 获取表 '{table_name}' 注释时发生错误: {e}")
-            print(f"使用表名作为 '{table_name}' 的注释。")
-            return table_name  # 出现错误时，使用表名作为默认
-
-    def get_table_description(self, table_name, connection):
+        :param cursor: Hive 游标对象
+        :return: (表注释, 列信息列表)，列信息每个元素为 (列名, 列类型, 列注释)
         """
-        获取表的列信息和中文注释
-
-        :param table_name: 表名
-        :param connection: Hive 连接对象
-        :return: 列信息列表，每个元素为 (列名, 列类型, 列注释)
-        """
-        cursor = connection.cursor()
-        cursor.execute(f"DESCRIBE {table_name}")  # 使用 DESCRIBE 获取表结构
+        cursor.execute(f"DESCRIBE EXTENDED {table_name}")
+        rows = cursor.fetchall()
 
+        # 列信息位于结果的开头，遇到空行或以 # 开头的分区信息行时结束
         columns = []
-        for row in cursor.fetchall():
+        row_iter = iter(rows)
+        for row in row_iter:
             column_name = row[0].strip() if row[0] else ''
+            if not column_name or column_name.startswith('#'):
+                break
             column_type = row[1].strip() if row[1] else ''
             column_comment = row[2].strip() if len(row) > 2 and row[2] else ""  # 获取列的注释
             columns.append((column_name, column_type, column_comment))
 
-        return columns
+        # 表注释位于 Detailed Table Information 行的 parameters 中，例如 parameters:{comment=表注释, ...}
+        table_comment = None
+        for row in row_iter:
+            if row[0] and row[0].strip() == 'Detailed Table Information' and row[1]:
+                match = TABLE_COMMENT_PATTERN.search(row[1])
+                if match and match.group(1).strip():
+                    table_comment = match.group(1).strip()
+                break
+
+        if not table_comment:
+            print(f"表 '{table_name}' 没有通过 DESCRIBE EXTENDED 获取注释，使用表名作为注释。")
+            table_comment = table_name
+
+        return table_comment, columns
 
-    def fetch_table_data(self, table_name, columns, connection):
+    def get_tables_metadata(self, tables, cursor):
+        """
+        获取所有表的注释和列信息，优先使用本地缓存，只对缺失或过期的表查询 Hive
+
+        :param tables: 表名列表
+        :param cursor: Hive 游标对象
+        :return: 字典，键为表名，值为 (表注释, 列信息列表)，获取失败的表不包含在内
+        """
+        table_meta = load_meta_cache(self.database) if self.use_meta_cache else {}
+        missing_tables = [table for table in tables if table not in table_meta]
+
+        print("----- 获取表的元数据 -----")
+        print(f"缓存命中 {len(tables) - len(missing_tables)} 张表，需要从 Hive 查询 {len(missing_tables)} 张表。")
+
+        fetched_meta = {}
+        for table in missing_tables:
+            try:
+                fetched_meta[table] = self.get_table_metadata(table, cursor)
+            except Exception as e:
+                print(f"获取表 '{table}' 的元数据时发生错误: {e}")
+
+        if self.use_meta_cache:
+            save_meta_cache(self.database, fetched_meta)
+        print("----- 结束获取元数据 -----\n")
+
+        table_meta.update(fetched_meta)
+        return {table: table_meta[table] for table in tables if table in table_meta}
+
+    def select_columns(self, columns):
+        """
+        根据列筛选函数选出需要导出的列
+
+        :param columns: 表的列信息，每个元素为 (列名, 列类型, 列注释)
+        :return: 需要导出的列信息
+        """
+        if self.column_filter is None:
+            return columns
+        return [col for col in columns if self.column_filter(col[0])]
+
+    def fetch_table_data(self, table_name, columns, cursor):
         """
         从 Hive 中获取数据
 
         :param table_name: 表名
-        :param columns: 表的列信息
-        :param connection: Hive 连接对象
+        :param columns: 需要导出的列信息
+        :param cursor: Hive 游标对象
         :return: pandas DataFrame
         """
-        cursor = connection.cursor()
-        cursor.execute(f"SELECT * FROM {table_name}")  # 获取表中的所有数据
-        data = cursor.fetchall()
+        if not columns:
+            raise ValueError(f"表 '{table_name}' 没有需要导出的列。")
+
+        # 只查询需要导出的列，并将行数限制下推到 Hive
+        selected_columns = ", ".join(f"`{col[0]}`" for col in columns)
+        limit_clause = f" LIMIT {int(self.row_limit)}" if self.row_limit is not None else ""
+
+        cursor.arraysize = FETCH_BATCH_SIZE
+        cursor.execute(f"SELECT {selected_columns} FROM {table_name}{limit_clause}")
 
         # 使用中文注释作为列名，如果没有注释则使用原列名
         column_names = [col[2] if col[2] else col[0] for col in columns]
-        df = pd.DataFrame(data, columns=column_names)
-        return df
-
-    def sanitize_filename(self, filename):
-        """
-        清理文件名，移除非法字符
 
-        :param filename: 原始文件名
-        :return: 清理后的文件名
-        """
-        # 移除非法字符
-        sanitized = re.sub(r'[<>:"/\\|?*]', '', filename)
-        # 截断到适合文件系统的长度（例如，255字符）
-        return sanitized[:255]
+        # 分批拉取并逐批构建 DataFrame，每批的行元组用完即释放，避免一次性持有全部行数据
+        frames = []
+        while True:
+            rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                break
+            frames.append(pd.DataFrame(rows, columns=column_names))
+        if frames:
+            df = pd.concat(frames, ignore_index=True)
+        else:
+            df = pd.DataFrame(columns=column_names)
+        return df
 
     def get_unique_filename(self, base_filename):
         """
-        获取唯一的文件名，如果文件名已存在，则在末尾追加序号。
+        获取唯一的文件名，如果文件名已存在（输出目录中已有或本次已使用），则在末尾追加序号。
 
         :param base_filename: 基础文件名（不包含扩展名）
         :return: 唯一的文件名（包含扩展名）
         """
-        if base_filename not in self.existing_filenames:
-            self.existing_filenames[base_filename] = 1
-            return base_filename + ".xlsx"
-        else:
-            self.existing_filenames[base_filename] += 1
-            unique_filename = f"{base_filename}_{self.existing_filenames[base_filename]}.xlsx"
+        unique_filename = f"{base_filename}.xlsx"
+        counter = 1
+        # 使用 normcase 比较，兼容不区分大小写的文件系统
+        while os.path.normcase(unique_filename) in self.existing_filenames:
+            counter += 1
+            unique_filename = f"{base_filename}_{counter}.xlsx"
+        self.existing_filenames.add(os.path.normcase(unique_filename))
+        if counter > 1:
             print(f"警告: 文件名 '{unique_filename}' 已存在，使用新的文件名。")
-            return unique_filename
+        return unique_filename
 
-    def write_to_excel(self, df, table_comment, table_name, columns, table_index, total_tables):
+    def write_to_excel(self, df, table_comment, table_name, columns, file_path):
         """
         将单个 DataFrame 写入 Excel 文件，并自动调整列宽，同时在 Sheet2 中写入表的详细信息
 
         :param df: pandas DataFrame
-        :param table_comment: 表的中文注释，用作文件名
+        :param table_comment: 表的中文注释
         :param table_name: 表名，用作辅助信息
         :param columns: 表的列信息，用于获取列注释
+        :param file_path: 写入的文件路径
+        """
+        # write-only 模式不检查工作表大小，超出 Excel 限制的文件无法打开，需要提前检查（含表头行）
+        if len(df) + 1 > EXCEL_MAX_ROWS or df.shape[1] > EXCEL_MAX_COLUMNS:
+            raise ValueError(
+                f"表 '{table_name}' 的数据超出 Excel 工作表大小限制: {len(df) + 1} 行, {df.shape[1]} 列，"
+                f"最大为 {EXCEL_MAX_ROWS} 行, {EXCEL_MAX_COLUMNS} 列。可通过 row_limit 限制导出的行数。"
+            )
+
+        # 使用 openpyxl 的写入模式（write-only）流式写入 Excel 文件，避免在内存中保留全部单元格对象
+        try:
+            workbook = Workbook(write_only=True)
+
+            # 写入数据到 Sheet1（写入模式下列宽必须在追加行之前设置）
+            worksheet_data = workbook.create_sheet("数据")
+            adjust_column_widths(worksheet_data, df, columns_info=None)
+            worksheet_data.append(list(df.columns))
+            for row in iter_dataframe_rows(df):
+                worksheet_data.append(row)
+
+            # 写入表信息到 Sheet2
+            table_info = [
+                ["信息", "内容"],
+                ["表名", table_name],
+                ["表注释", table_comment],
+                ["数据量", len(df)]
+            ]
+            worksheet_table_info = workbook.create_sheet("表信息")
+            for column_letter, width in TABLE_INFO_COLUMN_WIDTHS.items():
+                worksheet_table_info.column_dimensions[column_letter].width = width
+            for row in table_info:
+                worksheet_table_info.append(row)
+
+            # 写入列信息到 Sheet3
+            column_info = [["列名", "列类型", "列注释"]] + list(columns)
+            worksheet_column_info = workbook.create_sheet("列信息")
+            for column_letter, width in COLUMN_INFO_COLUMN_WIDTHS.items():
+                worksheet_column_info.column_dimensions[column_letter].width = width
+            for row in column_info:
+                worksheet_column_info.append(row)
+
+            workbook.save(file_path)
+        except Exception as e:
+            print(f"导出表 '{table_comment}' 到文件 '{file_path}' 时发生错误: {e}")
+            raise
+
+    def save_exported_file(self, temp_path, table_comment, table_index, total_tables):
+        """
+        将子进程写入的临时文件重命名为以表注释命名的唯一文件名
+
+        :param temp_path: 子进程写入的临时文件路径
+        :param table_comment: 表的中文注释，用作文件名
         :param table_index: 当前处理的表序号
         :param total_tables: 符合条件的总表数量
+        :return: 是否成功保存
         """
-        if not os.path.exists(self.excel_output_dir):
-            os.makedirs(self.excel_output_dir)  # 如果目录不存在，创建目录
-
-        valid_filename = self.sanitize_filename(table_comment) or "输出"
+        valid_filename = sanitize_filename(table_comment) or "输出"
         unique_filename = self.get_unique_filename(valid_filename)
         file_path = os.path.join(self.excel_output_dir, unique_filename)
 
-        # 检查文件是否存在（实际上通过 get_unique_filename 已经处理）
+        # 检查文件是否存在（get_unique_filename 已排除扫描时存在的文件，这里防止之后被其他程序创建）
         if os.path.exists(file_path):
             print(f"警告: 文件 '{unique_filename}' 已存在，无法覆盖。")
-            # 这里已通过 get_unique_filename 生成唯一文件名，通常不会到达这里
-            # 但保留作为安全措施
-        else:
-            # 使用 openpyxl 引擎写入 Excel 文件
-            try:
-                with pd.ExcelWriter(file_path, engine='openpyxl') as writer:
-                    # 写入数据到 Sheet1
-                    df.to_excel(writer, sheet_name="数据", index=False)
-
-                    # 获取工作簿和工作表对象
-                    worksheet_data = writer.sheets["数据"]
-
-                    # 使用实用工具模块调整列宽
-                    adjust_column_widths(worksheet_data, df, columns_info=None)
-
-                    # 准备表的详细信息
-                    table_info = [
-                        ["表名", table_name],
-                        ["表注释", table_comment],
-                        ["数据量", len(df)]
-                    ]
+            os.remove(temp_path)
+            return False
 
-                    # 准备列的信息
-                    column_info_headers = ["列名", "列类型", "列注释"]
-                    column_info = [column_info_headers] + list(columns)
-
-                    # 写入表信息到 Sheet2
-                    df_table_info = pd.DataFrame(table_info, columns=["信息", "内容"])
-                    df_table_info.to_excel(writer, sheet_name="表信息", index=False)
-
-                    # 写入列信息到 Sheet3
-                    df_column_info = pd.DataFrame(column_info[1:], columns=column_info_headers)
-                    df_column_info.to_excel(writer, sheet_name="列信息", index=False)
-
-                    # 获取工作表对象并调整列宽
-                    worksheet_table_info = writer.sheets["表信息"]
-                    adjust_column_widths(worksheet_table_info, df_table_info, columns_info=None)
-
-                    worksheet_column_info = writer.sheets["列信息"]
-                    adjust_column_widths(worksheet_column_info, df_column_info, columns_info=None)
-
-                print(f"已导出表 {table_index}/{total_tables}: '{table_comment}' 到文件 '{unique_filename}'。")
-            except Exception as e:
-                print(f"导出表 '{table_comment}' 到文件 '{unique_filename}' 时发生错误: {e}")
-                raise
+        os.replace(temp_path, file_path)
+        print(f"已导出表 {table_index}/{total_tables}: '{table_comment}' 到文件 '{unique_filename}'。")
+        return True
 
     def export(self):
         """
-        从 Hive 导出符合前缀的所有表数据并写入单独的 Excel 文件
+        从 Hive 导出符合前缀的所有表数据并写入单独的 Excel 文件。
+        表的元数据在主进程中一次性获取（优先使用本地缓存），各表数据在进程池中并行导出
         """
-        with get_hive_connection() as connection:
-            try:
-                print("----- 开始导出过程 -----\n")
-                print("连接到 Hive...")
+        try:
+            print("----- 开始导出过程 -----\n")
+            with get_hive_connection() as connection:
                 print("----- 连接成功 -----\n")
 
-                # 获取符合前缀的所有表名
-                tables = self.get_tables_by_prefix(connection)
-                total_tables = len(tables)
-                if not tables:
-                    raise ValueError(f"未找到符合前缀 '{self.prefix}' 的任何表。")
-
-                failed_tables = []
-                exported_files = 0
-
-                # 遍历每个表，获取数据并导出
-                for idx, table in enumerate(tables, 1):
+                # 整个元数据获取过程复用同一个游标
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(f"USE {self.database}")  # 切换到指定数据库
+
+                    # 获取符合前缀的所有表名
+                    tables = self.get_tables_by_prefix(cursor)
+                    if not tables:
+                        raise ValueError(f"未找到符合前缀 '{self.prefix}' 的任何表。")
+
+                    # 一次性获取所有表的注释和列信息（优先使用本地缓存）
+                    table_meta = self.get_tables_metadata(tables, cursor)
+                finally:
+                    cursor.close()
+
+            # 在主进程中完成列筛选，子进程只查询筛选后的列
+            table_meta = {
+                table: (table_comment, self.select_columns(columns))
+                for table, (table_comment, columns) in table_meta.items()
+            }
+
+            total_tables = len(tables)
+
+            os.makedirs(self.excel_output_dir, exist_ok=True)  # 如果目录不存在，创建目录
+
+            # 每张表的获取和写入相互独立，提交到进程池并行处理，每个子进程使用自己的 Hive 连接
+            results = {}
+            errors = {}
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                futures = {
+                    executor.submit(
+                        _export_one, self.database, self.excel_output_dir, self.row_limit,
+                        table, *table_meta[table], idx, total_tables
+                    ): idx
+                    for idx, table in enumerate(tables, 1)
+                    if table in table_meta
+                }
+                for future in as_completed(futures):
+                    idx = futures[future]
                     try:
-                        print("----- 开始处理表 -----")
-                        print(f"表名: {table} ({idx}/{total_tables})")
-
-                        # 获取表的中文注释
-                        table_comment = self.get_table_comment(table, connection)
-
-                        # 打印表名和表注释
-                        print(f"表注释: {table_comment}")
-
-                        # 获取表结构和列信息
-                        columns = self.get_table_description(table, connection)
-
-                        # 打印列信息
-                        print("列信息:")
-                        for col in columns:
-                            print(f"  列名: {col[0]}, 列注释: {col[2]}")
-
-                        # 获取表数据
-                        df = self.fetch_table_data(table, columns, connection)
-
-                        # 将表数据写入单独的 Excel 文件
-                        self.write_to_excel(df, table_comment, table, columns, idx, total_tables)
-                        exported_files += 1
-
-                        print("----- 结束处理表 -----\n")
-
+                        results[idx] = future.result()
                     except Exception as table_e:
-                        print(f"导出表 '{table}' 失败: {table_e}")
+                        errors[idx] = table_e
+
+            # 所有子进程结束后，按表的顺序重命名文件，保证重名文件的序号稳定
+            # 只扫描一次输出目录，之后的重名判断都在内存中完成
+            self.existing_filenames = {os.path.normcase(name) for name in os.listdir(self.excel_output_dir)}
+            failed_tables = []
+            exported_files = 0
+            for idx, table in enumerate(tables, 1):
+                try:
+                    if table not in table_meta:
+                        raise ValueError("无法获取表的元数据。")
+                    if idx in errors:
+                        raise errors[idx]
+                    table_comment, temp_path = results[idx]
+                    if self.save_exported_file(temp_path, table_comment, idx, total_tables):
+                        exported_files += 1
+                    else:
                         failed_tables.append(table)
+                except Exception as table_e:
+                    print(f"导出表 '{table}' 失败: {table_e}")
+                    failed_tables.append(table)
+
+            # 汇总报告
+            print("----- 导出过程汇总 -----")
+            print(f"预期生成文件数量: {total_tables}")
+            print(f"实际生成文件数量: {exported_files}")
+            if failed_tables:
+                print(f"以下表导出失败 ({len(failed_tables)}):")
+                for failed_table in failed_tables:
+                    print(f"  - {failed_table}")
+            else:
+                print("所有表均已成功导出。")
+            print("----- 导出过程结束 -----")
 
-                # 汇总报告
-                print("----- 导出过程汇总 -----")
-                print(f"预期生成文件数量: {total_tables}")
-                print(f"实际生成文件数量: {exported_files}")
-                if failed_tables:
-                    print(f"以下表导出失败 ({len(failed_tables)}):")
-                    for failed_table in failed_tables:
-                        print(f"  - {failed_table}")
-                else:
-                    print("所有表均已成功导出。")
-                print("----- 导出过程结束 -----")
-
-            except Exception as e:
-                print(f"导出过程中发生错误: {e}")
-                raise  # 抛出异常，方便调用方处理
+        except Exception as e:
+            print(f"导出过程中发生错误: {e}")
+            raise  # 抛出异常，方便调用方处理
 
     def test_exporter(self):
         """
@@ -285,6 +378,57 @@ class HiveToExcelExporter:
             print(f"测试导出过程中发生错误: {e}")
 
 
+def _export_one(database, excel_output_dir, row_limit, table_name, table_comment, columns, table_index, total_tables):
+    """
+    在子进程中导出单张表：获取表数据，并写入以表名命名的临时文件。
+    子进程之间无法共享已使用的文件名，最终文件名由主进程在所有子进程结束后统一确定。
+
+    :param database: Hive 数据库名
+    :param excel_output_dir: 输出 Excel 文件的目录路径
+    :param row_limit: 每张表最多导出的行数，为 None 时导出全部数据
+    :param table_name: 表名
+    :param table_comment: 表的中文注释
+    :param columns: 需要导出的列信息，每个元素为 (列名, 列类型, 列注释)
+    :param table_index: 当前处理的表序号
+    :param total_tables: 符合条件的总表数量
+    :return: (表注释, 临时文件路径)
+    """
+    exporter = HiveToExcelExporter(database, None, excel_output_dir, row_limit=row_limit)
+
+    print("----- 开始处理表 -----")
+    print(f"表名: {table_name} ({table_index}/{total_tables})")
+
+    # 打印表名和表注释
+    print(f"表注释: {table_comment}")
+
+    # 打印列信息
+    print("列信息:")
+    for col in columns:
+        print(f"  列名: {col[0]}, 列注释: {col[2]}")
+
+    with get_hive_connection() as connection:
+        cursor = connection.cursor()
+        try:
+            cursor.execute(f"USE {database}")  # 子进程使用新的连接，需要重新切换数据库
+
+            # 获取表数据
+            df = exporter.fetch_table_data(table_name, columns, cursor)
+        finally:
+            cursor.close()
+
+    # 将表数据写入临时文件（表名在数据库内唯一，不会与其他子进程冲突）
+    temp_path = os.path.join(excel_output_dir, f".{table_name}.xlsx.tmp")
+    try:
+        exporter.write_to_excel(df, table_comment, table_name, columns, temp_path)
+    except Exception:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+    print("----- 结束处理表 -----\n")
+    return table_comment, temp_path
+
+
 if __name__ == "__main__":
     # 配置导出参数
     exporter = HiveToExcelExporter(
@@ -1,7 +1,8 @@
 # utils/excel_utils.py
 
+import pandas as pd
 from openpyxl.utils import get_column_letter
-from .string_utils import calculate_display_width
+from .string_utils import calculate_display_width, calculate_display_width_uncached, calculate_display_widths_array
 
 
 def adjust_column_widths(worksheet, df, columns_info=None, max_width=100):
@@ -29,11 +30,8 @@ def adjust_column_widths(worksheet, df, columns_info=None, max_width=100):
         # 计算列注释的显示宽度
         header_width = calculate_display_width(str(column_comment))
 
-        # 计算列数据的最大显示宽度
-        if not df[column].empty:
-            data_max_length = df[column].astype(str).map(calculate_display_width).max()
-        else:
-            data_max_length = 0
+        # 计算列数据的最大显示宽度（按位置取列，避免列名重复时取到多列）
+        data_max_length = calculate_column_data_width(df.iloc[:, idx - 1], max_width)
 
         # 取最大值并加一些额外空间
         max_display_width = max(header_width, data_max_length) + 2  # 额外空间
@@ -41,3 +39,84 @@ def adjust_column_widths(worksheet, df, columns_info=None, max_width=100):
         # 设置列宽，限制最大宽度
         adjusted_width = min(max_display_width, max_width)
         worksheet.column_dimensions[column_letter].width = adjusted_width
+
+
+def calculate_column_data_width(column_data, max_width=100):
+    """
+    计算一列数据的最大显示宽度，对空列、整数列和纯 ASCII 列走快速路径。
+
+    :param column_data: pandas Series
+    :param max_width: 列宽的最大限制，超过该宽度的值只需计算到该宽度
+    :return: 最大显示宽度
+    """
+    if column_data.empty:
+        return 0
+
+    # 整数列的最大宽度一定出现在最小值或最大值上，无需逐个转换为字符串
+    if pd.api.types.is_integer_dtype(column_data.dtype) and not column_data.isna().all():
+        return max(len(str(column_data.min())), len(str(column_data.max())))
+
+    values = column_data.astype(str).to_numpy()
+
+    # 数值、布尔、日期类型转换后的字符串以及纯 ASCII 字符串中不含中文字符，宽度即长度
+    # （category、string 等类型可能包含中文，仍需检查）
+    is_ascii_dtype = (
+        pd.api.types.is_numeric_dtype(column_data.dtype)
+        or pd.api.types.is_datetime64_any_dtype(column_data.dtype)
+        or pd.api.types.is_timedelta64_dtype(column_data.dtype)
+    )
+    if is_ascii_dtype or all(map(str.isascii, values)):
+        return max(map(len, values))
+
+    return int(calculate_display_widths_array(values, max_length=max_width).max())
+
+
+def update_column_widths(max_widths, row):
+    """
+    用一行数据更新各列的最大显示宽度，适合在逐行读取或写入数据的同时计算列宽。
+
+    :param max_widths: 各列当前的最大显示宽度列表（0-based），会被就地更新
+    :param row: 一行的值序列
+    """
+    if len(row) > len(max_widths):
+        max_widths.extend([0] * (len(row) - len(max_widths)))
+    for idx, value in enumerate(row):
+        if value is None:
+            continue
+        width = calculate_display_width_uncached(str(value))
+        if width > max_widths[idx]:
+            max_widths[idx] = width
+
+
+def set_column_widths(worksheet, max_widths, max_width=100):
+    """
+    根据各列的最大显示宽度设置 Excel 工作表的列宽，宽度为 0 的列保持默认列宽。
+    对于 write-only 模式的工作表，需要在追加行之前调用。
+
+    :param worksheet: openpyxl 的工作表对象
+    :param max_widths: 各列的最大显示宽度列表（0-based）
+    :param max_width: 列宽的最大限制
+    """
+    for idx, width in enumerate(max_widths, 1):  # 1-based index
+        if width:
+            # 加一些额外空间，并限制最大宽度
+            worksheet.column_dimensions[get_column_letter(idx)].width = min(width + 2, max_width)
+
+
+def iter_dataframe_rows(df):
+    """
+    逐行迭代 DataFrame 的值，用于 openpyxl write-only 模式下的 append。
+    缺失值（NaN、NaT、None）转换为 None，写入 Excel 后为空单元格，与 to_excel 的行为一致。
+
+    :param df: pandas DataFrame
+    :return: 行值元组的迭代器
+    """
+    na_mask = df.isna()
+    columns = []
+    for idx in range(df.shape[1]):
+        column = df.iloc[:, idx]
+        column_na = na_mask.iloc[:, idx]
+        if column_na.any():
+            column = column.astype(object).where(~column_na, None)
+        columns.append(column)
+    return zip(*columns)
@@ -0,0 +1,78 @@
+# utils/hive_meta_cache.py
+
+import json
+import os
+import time
+import pandas as pd
+
+# 缓存目录和有效期（小时），过期后重新从 Hive 查询
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "data_toolkit")
+CACHE_TTL_HOURS = 24
+
+
+def get_cache_path(database):
+    """
+    获取数据库元数据缓存文件的路径
+
+    :param database: Hive 数据库名
+    :return: 缓存文件路径
+    """
+    return os.path.join(CACHE_DIR, f"{database}_meta.parquet")
+
+
+def load_meta_cache(database, ttl_hours=CACHE_TTL_HOURS):
+    """
+    从本地 parquet 文件加载表的元数据缓存，只返回未过期的记录
+
+    :param database: Hive 数据库名
+    :param ttl_hours: 缓存有效期（小时）
+    :return: 字典，键为表名，值为 (表注释, 列信息列表)，列信息每个元素为 (列名, 列类型, 列注释)
+    """
+    cache_path = get_cache_path(database)
+    if not os.path.exists(cache_path):
+        return {}
+
+    try:
+        df_cache = pd.read_parquet(cache_path)
+    except Exception as e:
+        print(f"读取元数据缓存 '{cache_path}' 时出错: {e}")
+        return {}
+
+    expire_before = time.time() - ttl_hours * 3600
+    df_cache = df_cache[df_cache["fetched_at"] >= expire_before]
+
+    return {
+        row.table: (row.comment, [tuple(col) for col in json.loads(row.columns_json)])
+        for row in df_cache.itertuples(index=False)
+    }
+
+
+def save_meta_cache(database, table_meta):
+    """
+    将表的元数据写入本地 parquet 缓存，与已有记录合并，同名表以本次结果为准
+
+    :param database: Hive 数据库名
+    :param table_meta: 字典，键为表名，值为 (表注释, 列信息列表)
+    """
+    if not table_meta:
+        return
+
+    cache_path = get_cache_path(database)
+    fetched_at = time.time()
+    df_new = pd.DataFrame(
+        [
+            (table, comment, json.dumps(columns, ensure_ascii=False), fetched_at)
+            for table, (comment, columns) in table_meta.items()
+        ],
+        columns=["table", "comment", "columns_json", "fetched_at"]
+    )
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        if os.path.exists(cache_path):
+            df_old = pd.read_parquet(cache_path)
+            df_old = df_old[~df_old["table"].isin(df_new["table"])]
+            df_new = pd.concat([df_old, df_new], ignore_index=True)
+        df_new.to_parquet(cache_path, index=False)
+    except Exception as e:
+        print(f"写入元数据缓存 '{cache_path}' 时出错: {e}")
@@ -1,11 +1,12 @@
 # utils/merge_excel.py
 
 import os
-import pandas as pd
-from utils.excel_utils import adjust_column_widths  # 引入调整列宽的工具函数
-from utils.string_utils import calculate_display_width  # 引入计算显示宽度的工具函数
+from openpyxl import Workbook, load_workbook
+from utils.excel_utils import update_column_widths, set_column_widths  # 引入计算和设置列宽的工具函数
+from utils.string_utils import sanitize_filename  # 引入清理文件名的工具函数
 import re
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 
 def merge_excel_sheets(
@@ -14,7 +15,8 @@ def merge_excel_sheets(
         file_prefix=None,
         sheet_prefix="",
         delete_source=True,
-        source_sheet_indices=None
+        source_sheet_indices=None,
+        max_workers=4
 ):
     """
     合并多个 Excel 文件中的多个 sheet 到一个或多个新的 Excel 文件中，
@@ -29,6 +31,7 @@ def merge_excel_sheets(
     :param delete_source: 是否删除源文件，默认 True
     :param source_sheet_indices: 要合并的源文件中的 sheet 索引列表（1-based）。例如 [1, 3] 表示合并第1和第3个 Sheet。
                                  默认为 [1]，即仅合并第一个 Sheet。
+    :param max_workers: 并发读取源文件的最大线程数（同时也是提前读取到内存中的最大文件数），默认 4
     """
     if source_sheet_indices is None:
         source_sheet_indices = [1]  # 默认仅合并第一个 Sheet
@@ -78,25 +81,36 @@ def merge_excel_sheets(
         # 生成输出文件名
         output_file = generate_output_filename(output_folder, group_prefix)
 
-        # 创建一个新的 Excel writer 对象
-        with pd.ExcelWriter(output_file, engine='openpyxl') as writer:
-            # 跟踪合并的工作表名称以避免重复
-            existing_sheet_names = set()
+        # 创建一个新的 write-only 工作簿，逐行流式写入，避免在内存中保留全部单元格对象
+        output_workbook = Workbook(write_only=True)
+        # 跟踪合并的工作表名称以避免重复
+        existing_sheet_names = set()
+
+        # 读取文件（解压和 XML 解析）相互独立，提交到线程池提前读取；写入在当前线程中按文件顺序进行。
+        # 读取结果包含文件的全部行，因此最多只提前读取 max_workers 个文件，避免整组文件同时驻留内存
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {}
+
+            def submit_read(index):
+                if index < len(files):
+                    file_path = os.path.join(input_folder, files[index])
+                    futures[index] = executor.submit(read_selected_sheets, file_path, source_sheet_indices)
+
+            for index in range(max_workers):
+                submit_read(index)
 
             for file_index, excel_file in enumerate(files, 1):
                 file_path = os.path.join(input_folder, excel_file)
                 print(f"正在处理文件 {file_index}/{len(files)}: {file_path}")
 
-                # 加载 Excel 文件中的所有 sheet
                 try:
-                    excel_data = pd.read_excel(file_path, sheet_name=None)  # sheet_name=None 会读取所有 sheet
+                    sheets_to_merge = futures.pop(file_index - 1).result()
                 except Exception as e:
                     print(f"无法读取文件 {excel_file}: {e}")
                     continue
-
-                sheet_names = list(excel_data.keys())
-                num_sheets_in_file = len(sheet_names)
-                sheets_to_merge = [sheet_names[idx - 1] for idx in source_sheet_indices if idx <= num_sheets_in_file]
+                finally:
+                    # 取出一个文件的结果后再提交下一个文件，保持同时读取的文件数不超过 max_workers
+                    submit_read(file_index - 1 + max_workers)
 
                 # 计算实际合并的 sheet 数量
                 num_sheets_to_merge = len(sheets_to_merge)
@@ -105,9 +119,7 @@ def merge_excel_sheets(
                     print(f"警告: 文件 {excel_file} 中没有指定的 sheet，跳过该文件。")
                     continue
 
-                for sheet_idx, selected_sheet_name in zip(source_sheet_indices, sheets_to_merge):
-                    df = excel_data[selected_sheet_name]
-
+                for selected_sheet_name, rows, max_widths in sheets_to_merge:
                     # 根据要合并的 sheet 数量决定命名规则
                     if num_sheets_to_merge == 1:
                         base_sheet_name = f"{sheet_prefix}{os.path.splitext(excel_file)[0]}"
@@ -121,11 +133,13 @@ def merge_excel_sheets(
 
                     # 将数据写入新的 Excel 文件
                     try:
-                        df.to_excel(writer, sheet_name=unique_sheet_name, index=False)
-                        worksheet = writer.sheets[unique_sheet_name]
+                        worksheet = output_workbook.create_sheet(unique_sheet_name)
 
-                        # 调整列宽
-                        adjust_column_widths(worksheet, df, columns_info=None)  # 使用列名作为依据
+                        # 调整列宽（write-only 模式下需在追加行之前设置，宽度已在读取时计算）
+                        set_column_widths(worksheet, max_widths)
+
+                        for row in rows:
+                            worksheet.append(row)
 
                     except Exception as e:
                         print(f"写入 sheet '{unique_sheet_name}' 时发生错误: {e}")
@@ -139,6 +153,12 @@ def merge_excel_sheets(
                     except Exception as e:
                         print(f"无法删除文件 {file_path}: {e}")
 
+        if not existing_sheet_names:
+            print(f"前缀 '{group_prefix}' 的文件中没有可合并的 sheet，未生成文件。")
+            continue
+
+        output_workbook.save(output_file)
+
         # 汇总报告
         print(f"已合并前缀 '{group_prefix}' 的文件到: {output_file}")
         print(f"生成的文件包含 {len(existing_sheet_names)} 个 sheet。")
@@ -146,6 +166,33 @@ def merge_excel_sheets(
         print(f"----- 完成合并前缀 '{group_prefix}' 的文件 -----\n")
 
 
+def read_selected_sheets(file_path, source_sheet_indices):
+    """
+    以只读模式读取 Excel 文件中指定序号的 sheet 的全部行，并在读取的同时计算各列的最大显示宽度。
+
+    :param file_path: Excel 文件路径
+    :param source_sheet_indices: 要读取的 sheet 索引列表（1-based），超出文件 sheet 数量的索引将被忽略
+    :return: 列表，每个元素为 (sheet 名称, 行数据列表, 各列最大显示宽度列表)
+    """
+    workbook = load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet_names = workbook.sheetnames
+        selected_sheet_names = [sheet_names[idx - 1] for idx in source_sheet_indices if idx <= len(sheet_names)]
+
+        sheets = []
+        for sheet_name in selected_sheet_names:
+            rows = []
+            max_widths = []
+            # 读取与列宽计算合并为一次遍历，写入时无需再次扫描全部数据
+            for row in workbook[sheet_name].values:
+                rows.append(row)
+                update_column_widths(max_widths, row)
+            sheets.append((sheet_name, rows, max_widths))
+        return sheets
+    finally:
+        workbook.close()
+
+
 def group_files_by_common_prefix(files):
     """
     将文件按最长共同前缀分组。
@@ -174,26 +221,17 @@ def generate_output_filename(output_folder, prefix):
     :return: 唯一的输出文件路径
     """
     sanitized_prefix = sanitize_filename(prefix) or "合并结果"
-    output_file = os.path.join(output_folder, f"{sanitized_prefix}.xlsx")
+
+    # 只扫描一次输出目录，使用 normcase 比较以兼容不区分大小写的文件系统
+    existing_files = {os.path.normcase(name) for name in os.listdir(output_folder)}
+    output_filename = f"{sanitized_prefix}.xlsx"
     counter = 1
-    base, ext = os.path.splitext(output_file)
-    while os.path.exists(output_file):
-        output_file = f"{base}_{counter}{ext}"
+    while os.path.normcase(output_filename) in existing_files:
+        output_filename = f"{sanitized_prefix}_{counter}.xlsx"
         counter += 1
     if counter > 1:
-        print(f"警告: 文件名 '{os.path.basename(output_file)}' 已存在，使用新的文件名。")
-    return output_file
-
-
-def sanitize_filename(filename):
-    """
-    清理文件名，移除非法字符
-
-    :param filename: 原始文件名
-    :return: 清理后的文件名
-    """
-    sanitized = re.sub(r'[<>:"/\\|?*]', '', filename)
-    return sanitized[:255]
+        print(f"警告: 文件名 '{output_filename}' 已存在，使用新的文件名。")
+    return os.path.join(output_folder, output_filename)
 
 
 def get_unique_sheet_name(base_name, existing_names):
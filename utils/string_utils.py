@@ -1,20 +1,71 @@
 # utils/string_utils.py
 
+import functools
 import re
+import numpy as np
 
-def calculate_display_width(s):
+# 文件名中不允许出现的字符
+INVALID_FILENAME_PATTERN = re.compile(r'[<>:"/\\|?*]')
+
+
+def calculate_display_width_uncached(s):
     """
     计算字符串的显示宽度，中文字符计为2，其他字符计为1。
+    不缓存结果，用于逐个单元格计算等取值大多不重复的场景。
 
     :param s: 输入字符串
     :return: 显示宽度
     """
     if not s:
         return 0
-    width = 0
-    for char in s:
-        if re.match(r'[\u4e00-\u9fff]', char):
-            width += 2
-        else:
-            width += 1
-    return width
+    # 直接比较码点范围（\u4e00-\u9fff），避免逐字符调用正则匹配
+    return len(s) + sum(1 for char in s if 0x4E00 <= ord(char) <= 0x9FFF)
+
+
+@functools.lru_cache(maxsize=100_000)
+def calculate_display_width(s):
+    """
+    计算字符串的显示宽度，中文字符计为2，其他字符计为1。
+    结果按字符串缓存，用于表头等重复出现的字符串。
+
+    :param s: 输入字符串
+    :return: 显示宽度
+    """
+    return calculate_display_width_uncached(s)
+
+
+def calculate_display_widths_array(arr, max_length=100, chunk_size=10000):
+    """
+    向量化计算数组中每个字符串的显示宽度，中文字符计为2，其他字符计为1。
+    与 calculate_display_width 的规则一致，用于整列数据的批量计算。
+    字符串先截断到 max_length 个字符并分块处理，内存占用与最长的值无关；
+    截断后的宽度不小于 max_length，因此按 max_length 限制列宽时结果不受影响。
+
+    :param arr: 字符串数组（numpy 数组、pandas Series 或列表），非字符串元素会先转换为字符串
+    :param max_length: 每个字符串参与计算的最大字符数
+    :param chunk_size: 每次向量化计算的元素数量
+    :return: 每个元素显示宽度组成的 numpy 整数数组（超过 max_length 个字符的元素按截断后计算）
+    """
+    values = np.asarray(arr).ravel()
+    widths = np.zeros(values.size, dtype=np.int64)
+
+    for start in range(0, values.size, chunk_size):
+        # 直接转换为定长的 Unicode 数组，超出 max_length 的部分被截断，避免按最长的值分配内存
+        s = values[start:start + chunk_size].astype(f'<U{max_length}')
+
+        # 定长 Unicode 数组按 UTF-32 存储，可直接视为码点矩阵（每行一个字符串，不足部分以 0 填充）
+        code_points = s.view(np.uint32).reshape(s.size, -1)
+        wide_counts = ((code_points >= 0x4E00) & (code_points <= 0x9FFF)).sum(axis=1)
+        widths[start:start + s.size] = np.char.str_len(s) + wide_counts
+
+    return widths
+
+
+def sanitize_filename(filename):
+    """
+    清理文件名，移除非法字符，并截断到适合文件系统的长度（255字符）
+
+    :param filename: 原始文件名
+    :return: 清理后的文件名
+    """
+    return INVALID_FILENAME_PATTERN.sub('', filename)[:255]